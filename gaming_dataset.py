@@ -0,0 +1,40 @@
+# 온라인 게임 행동 데이터셋의 경로와 읽기 타입 정의
+# 앱(streamlit_app.py)과 배포용 Parquet 재생성이 같은 타입 정의를 공유하도록 분리
+# CSV를 수정한 뒤에는 `python gaming_dataset.py`로 Parquet 파일을 다시 만듭니다.
+import os
+
+import pandas as pd
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+CSV_PATH = os.path.join(DATA_DIR, "online_gaming_behavior_datasets.csv")
+PARQUET_PATH = os.path.join(DATA_DIR, "online_gaming_behavior_datasets.parquet")
+
+# CSV를 읽는 단계에서 적용하는 타입 (정수 다운캐스팅, 저카디널리티 문자열은 category)
+# 실수 열은 CSV 내보내기 값이 원본과 달라지지 않도록 float64 유지
+CSV_DTYPES = {
+    'PlayerID': 'int32', 'Age': 'int8', 'PlayerLevel': 'int16', 'AchievementsUnlocked': 'int16',
+    'SessionsPerWeek': 'int8', 'InGamePurchases': 'int8',
+    'PlayTimeHours': 'float64', 'AvgSessionDurationMinutes': 'float64',
+    'Gender': 'category', 'Location': 'category',
+    'GameGenre': 'category', 'GameDifficulty': 'category'
+}
+
+def read_csv(source=CSV_PATH):
+    # PyArrow CSV 엔진으로 읽고, 메모리 절약을 위해 읽는 단계에서 타입 지정
+    return pd.read_csv(source, engine='pyarrow', dtype=CSV_DTYPES)
+
+def parquet_is_stale(csv_path=CSV_PATH, parquet_path=PARQUET_PATH):
+    # Parquet이 없거나 CSV보다 오래되었으면 CSV 변경이 반영되지 않은 것으로 봄
+    if not os.path.exists(parquet_path):
+        return True
+    return os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(parquet_path)
+
+def build_parquet(csv_path=CSV_PATH, parquet_path=PARQUET_PATH):
+    # 같은 디렉터리의 임시 파일에 쓴 뒤 교체하여, 앱이 쓰는 도중의 파일을 읽지 않도록 함
+    tmp_path = parquet_path + ".tmp"
+    read_csv(csv_path).to_parquet(tmp_path, engine='pyarrow', compression='zstd', index=False)
+    os.replace(tmp_path, parquet_path)
+
+if __name__ == "__main__":
+    build_parquet()
+    print(f"{PARQUET_PATH} 파일을 {CSV_PATH}에서 다시 생성했습니다.")
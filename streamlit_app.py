@@ -2,17 +2,12 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import numpy as np
+import os
+import gaming_dataset # 데이터셋 경로/타입 정의와 Parquet 재생성 (같은 디렉터리)
 from math import exp # math.exp를 사용하여 Exp(B) 계산
 
-# 머신러닝 (ML) 모델링을 위한 라이브러리 추가
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
+# 머신러닝 (ML) 모델링 라이브러리는 이탈 예측 모델 함수 안에서 불러옴 (앱 시작 시 import 비용 절감)
 
 # 페이지 설정
 st.set_page_config(
@@ -55,23 +50,463 @@ def load_data():
 
     try:
         # 데이터가 이미 로드된 것으로 가정하고, 이 코드를 유지합니다.
-        df = pd.read_csv(data_url)
+        # 저장소에 함께 배포되는 Parquet 원본(zstd 압축, CSV와 같은 타입이 이미 적용됨)이 있으면
+        # 다운로드와 CSV 파싱 없이 바로 읽음 (생성 방법은 gaming_dataset.py 참고)
+        df = None
+        if not gaming_dataset.parquet_is_stale():
+            try:
+                df = pd.read_parquet(gaming_dataset.PARQUET_PATH, engine='pyarrow')
+            except Exception:
+                df = None # Parquet 파일을 읽을 수 없으면 CSV 원본으로 대체
+        if df is None:
+            # Parquet이 없거나 CSV보다 오래되었으면 CSV를 읽음 (로컬 CSV가 없을 때만 GitHub에서 다운로드)
+            df = gaming_dataset.read_csv(gaming_dataset.CSV_PATH if os.path.exists(gaming_dataset.CSV_PATH) else data_url)
         
         # UserID가 'PlayerID'로 되어 있으므로 통일
         df = df.rename(columns={'PlayerID': 'UserID'})
         
         # LTV(평생 가치) 프록시 계산: 구매 여부에 높은 가중치 부여
-        df['LTV_Proxy'] = df['InGamePurchases'] * 5000 + df['PlayTimeHours'] * 100 + df['PlayerLevel'] * 10
+        # (Series 임시 객체 없이 미리 할당한 float64 NumPy 버퍼 하나에 누적, 내보내기 값이 원본 계산과 동일)
+        ltv = np.empty(len(df), dtype=np.float64)
+        np.multiply(df['InGamePurchases'].to_numpy(), 5000.0, out=ltv, casting='unsafe')
+        ltv += df['PlayTimeHours'].to_numpy() * 100.0
+        ltv += df['PlayerLevel'].to_numpy() * 10.0
+        df['LTV_Proxy'] = ltv
         
         # EngagementLevel 순서 정의
         engagement_order = ['Low', 'Medium', 'High']
         df['EngagementLevel'] = pd.Categorical(df['EngagementLevel'], categories=engagement_order, ordered=True)
         
+        # 이탈 레이블: 'Low'(코드 0)를 이탈(1), 나머지를 활동(0)으로 정의 (재실행마다 계산하지 않도록 미리 생성)
+        # EngagementLevel 결측(코드 -1) 행은 NaN으로 남겨 모델 학습 전 결측치 처리에서 제거되도록 함
+        engagement_codes = df['EngagementLevel'].cat.codes.to_numpy()
+        df['Churn'] = np.where(engagement_codes < 0, np.nan, engagement_codes == 0).astype(np.float32)
+        
         return df
     except Exception as e:
         st.error(f"데이터 로드 오류: 데이터를 불러오는 데 실패했습니다. ({e})")
         return None
 
+# 사이드바 필터 옵션 (전체 데이터 기준으로 한 번만 계산)
+@st.cache_data(show_spinner=False)
+def get_filter_options():
+    df = load_data()
+    # category 타입의 unique()는 Categorical이므로 위젯에는 리스트로 전달
+    return {
+        'genders': df['Gender'].unique().tolist(),
+        'genres': df['GameGenre'].unique().tolist(),
+        'age_min': int(df['Age'].min()),
+        'age_max': int(df['Age'].max())
+    }
+
+# 필터 조합별 캐시에 보관할 최대 항목 수 (필터를 계속 바꿔도 메모리가 무한히 늘지 않도록 제한)
+FILTER_CACHE_MAX_ENTRIES = 32
+
+# 필터링 함수 (필터 조합별 캐싱 적용: 탭 전환 등 필터가 그대로인 재실행에서는 재계산하지 않음)
+@st.cache_data(show_spinner=False, max_entries=FILTER_CACHE_MAX_ENTRIES)
+def get_filtered(genders, genres, age_range):
+    df = load_data()
+    # 모든 값이 선택된 기본 상태에서는 마스크를 계산하지 않고 전체 데이터를 그대로 사용
+    # (아래 마스크는 Gender/GameGenre 결측 행을 제외하므로, 결측이 없을 때만 결과가 같음)
+    if (set(genders) >= set(df['Gender'].cat.categories) and not df['Gender'].hasnans and
+            set(genres) >= set(df['GameGenre'].cat.categories) and not df['GameGenre'].hasnans and
+            age_range[0] <= df['Age'].min() and age_range[1] >= df['Age'].max()):
+        return df
+    # 범주별 선택 여부 룩업 테이블을 category 코드로 인덱싱하여 행마다 해시 조회 없이 마스크 생성
+    # (마지막에 False를 추가하여 결측값 코드 -1은 항상 제외)
+    gender_keep = np.append(df['Gender'].cat.categories.isin(genders), False)
+    genre_keep = np.append(df['GameGenre'].cat.categories.isin(genres), False)
+    # 첫 번째 조건의 결과 배열 하나에 나머지 조건을 제자리(in-place) AND로 누적
+    age = df['Age'].to_numpy()
+    mask = gender_keep[df['Gender'].cat.codes.to_numpy()]
+    np.logical_and(mask, genre_keep[df['GameGenre'].cat.codes.to_numpy()], out=mask)
+    np.logical_and(mask, age >= age_range[0], out=mask)
+    np.logical_and(mask, age <= age_range[1], out=mask)
+    return df.iloc[np.flatnonzero(mask)]
+
+# 탭별 집계 함수 (필터 조합별 캐싱 적용: 탭을 다시 그릴 때 집계를 반복하지 않음)
+# (필터 조합마다 열 4개를 집계하므로 그만큼 항목 수를 늘려 같은 수의 필터 조합을 보관)
+@st.cache_data(show_spinner=False, max_entries=FILTER_CACHE_MAX_ENTRIES * 4)
+def get_value_counts(filter_key, column, sort=True):
+    # category 코드에 np.bincount를 적용해 해싱 없이 집계 (코드 -1은 결측값이므로 제외)
+    # sort=False이면 정렬 없이 범주 순서(예: Low/Medium/High)를 그대로 유지
+    values = get_filtered(*filter_key)[column]
+    codes = values.cat.codes.to_numpy()
+    counts = pd.Series(
+        np.bincount(codes[codes >= 0], minlength=len(values.cat.categories)),
+        index=pd.CategoricalIndex(values.cat.categories, dtype=values.dtype, name=column),
+        name='count'
+    )
+    if sort:
+        counts = counts.sort_values(ascending=False, kind='stable')
+    # 선택되지 않은 범주는 0으로 집계되므로 제외
+    return counts[counts > 0]
+
+@st.cache_data(show_spinner=False, max_entries=FILTER_CACHE_MAX_ENTRIES)
+def get_purchase_rate_by_engagement(filter_key):
+    # InGamePurchases가 0/1이므로 그룹 평균이 곧 구매 비율
+    return (
+        get_filtered(*filter_key).groupby('EngagementLevel', observed=True)['InGamePurchases']
+        .mean().mul(100).reset_index(name='PurchaseRate')
+    )
+
+@st.cache_data(show_spinner=False, max_entries=FILTER_CACHE_MAX_ENTRIES * 2)
+def get_engagement_share(filter_key, column):
+    # 두 열 모두 category 타입이므로 코드 쌍을 하나의 정수로 합쳐 np.bincount로 교차 집계 (해싱 없음)
+    data = get_filtered(*filter_key)
+    row_values, engagement = data[column], data['EngagementLevel']
+    row_codes, col_codes = row_values.cat.codes.to_numpy(), engagement.cat.codes.to_numpy()
+    n_rows, n_cols = len(row_values.cat.categories), len(engagement.cat.categories)
+    valid = (row_codes >= 0) & (col_codes >= 0) # 결측값(코드 -1) 제외
+    counts = np.bincount(
+        row_codes[valid].astype(np.intp) * n_cols + col_codes[valid], minlength=n_rows * n_cols
+    ).reshape(n_rows, n_cols)
+    # 관측된 범주 조합만 남김 (groupby(observed=True)와 같은 결과)
+    keep_rows, keep_cols = counts.sum(axis=1) > 0, counts.sum(axis=0) > 0
+    counts = counts[keep_rows][:, keep_cols]
+    return pd.DataFrame(
+        counts / counts.sum(axis=1, keepdims=True) * 100,
+        index=pd.CategoricalIndex(row_values.cat.categories[keep_rows], dtype=row_values.dtype, name=column),
+        columns=pd.CategoricalIndex(engagement.cat.categories[keep_cols], dtype=engagement.dtype, name='EngagementLevel')
+    )
+
+@st.cache_data(show_spinner=False, max_entries=FILTER_CACHE_MAX_ENTRIES)
+def get_overview_kpis(filter_key):
+    # 개요 탭의 주요 지표를 한 번에 계산
+    data = get_filtered(*filter_key)
+    return {
+        'n_users': len(data),
+        'avg_playtime': data['PlayTimeHours'].mean(),
+        'high_engagement': (data['EngagementLevel'] == 'High').sum(),
+        'purchase_rate': data['InGamePurchases'].mean() * 100, # 0/1 값이므로 평균이 곧 구매 비율
+        'avg_ltv': data['LTV_Proxy'].mean(),
+    }
+
+# 다운로드용 CSV 생성 함수 (필터 조합별 캐싱: 매 재실행마다 CSV를 다시 인코딩하지 않음)
+# (필터 조합마다 1~2MB를 차지하므로 최근 몇 개만 보관)
+@st.cache_data(show_spinner=False, max_entries=4)
+def get_csv_bytes(filter_key):
+    return get_filtered(*filter_key).to_csv(index=False).encode('utf-8-sig')
+
+# 이탈 예측 모델 변수 정의
+CHURN_FEATURES = [
+    'Age', 'Gender', 'Location', 'GameGenre', 'PlayTimeHours', 
+    'InGamePurchases', 'GameDifficulty', 'SessionsPerWeek', 
+    'AvgSessionDurationMinutes', 'PlayerLevel', 'AchievementsUnlocked'
+]
+CHURN_NUMERIC_FEATURES = ['Age', 'PlayTimeHours', 'SessionsPerWeek', 'AvgSessionDurationMinutes', 'PlayerLevel', 'AchievementsUnlocked']
+CHURN_CATEGORICAL_FEATURES = ['Gender', 'Location', 'GameGenre', 'GameDifficulty', 'InGamePurchases'] # InGamePurchases는 0/1이지만 OHE로 처리하여 Exp(B) 해석을 단순화
+CHURN_TARGET = 'Churn'
+CHURN_MAX_TRAIN_ROWS = 20_000 # 이보다 행이 많으면 층화 표본으로 학습
+
+# 이탈 모델 입력 데이터 요약 (필터 조합별 캐싱: 화면에 필요한 행/결측치 수만 반환하여 재실행마다 데이터프레임을 복사하지 않음)
+@st.cache_data(show_spinner=False, max_entries=FILTER_CACHE_MAX_ENTRIES)
+def get_churn_data_summary(filter_key):
+    is_missing = get_filtered(*filter_key)[CHURN_FEATURES + [CHURN_TARGET]].isnull().to_numpy()
+    return {
+        'n_rows': len(is_missing),
+        'nan_count': int(is_missing.sum()),
+        'n_complete': int((~is_missing.any(axis=1)).sum()),
+    }
+
+# 이탈 예측 모델 학습 함수 (필터 조합별로 학습된 파이프라인을 재사용)
+@st.cache_resource(show_spinner=False, max_entries=FILTER_CACHE_MAX_ENTRIES)
+def train_churn_model(filter_key):
+    from sklearn.model_selection import train_test_split
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler, OneHotEncoder
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    
+    # 1. 데이터 준비: 결측치가 있는 행 제거
+    df_model = get_filtered(*filter_key)[CHURN_FEATURES + [CHURN_TARGET]].dropna()
+    if len(df_model) > CHURN_MAX_TRAIN_ROWS:
+        df_model, _ = train_test_split(
+            df_model, train_size=CHURN_MAX_TRAIN_ROWS, stratify=df_model[CHURN_TARGET], random_state=42
+        )
+    X = df_model[CHURN_FEATURES]
+    y = df_model[CHURN_TARGET]
+    
+    # 2. 전처리 파이프라인 구축
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ('num', StandardScaler(), CHURN_NUMERIC_FEATURES),
+            ('cat', OneHotEncoder(handle_unknown='ignore', sparse_output=True), CHURN_CATEGORICAL_FEATURES)
+        ],
+        remainder='drop', # 나머지 컬럼은 버림
+        sparse_threshold=1.0 # 원핫 인코딩 결과를 밀집 행렬로 변환하지 않고 희소(CSR) 행렬로 유지
+    )
+
+    # 3. 모델 정의 및 학습
+    model = Pipeline(steps=[('preprocessor', preprocessor),
+                             ('classifier', LogisticRegression(solver='liblinear', random_state=42))])
+    
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    model.fit(X_train, y_train)
+    return model, X_test, y_test
+
+# 이탈 예측 모델 평가 함수 (필터 조합별 성능 지표 캐싱)
+@st.cache_data(show_spinner=False, max_entries=FILTER_CACHE_MAX_ENTRIES)
+def evaluate_churn_model(filter_key):
+    from sklearn.metrics import precision_recall_fscore_support, confusion_matrix, accuracy_score
+    
+    model, X_test, y_test = train_churn_model(filter_key)
+    y_pred = model.predict(X_test)
+    
+    # 성능 지표
+    accuracy = accuracy_score(y_test, y_pred)
+    conf_mat = confusion_matrix(y_test, y_pred)
+    churn_rate = y_test.sum() / len(y_test) * 100
+    
+    # 분류 보고서: 클래스별 지표 배열로 바로 DataFrame 생성 (classification_report의 dict 변환 생략)
+    precision, recall, f1, support = precision_recall_fscore_support(y_test, y_pred, labels=[0, 1])
+    report_df = pd.DataFrame(
+        {'precision': precision, 'recall': recall, 'f1-score': f1, 'support': support},
+        index=['Active (0)', 'Churn (1)']
+    )
+    report_df.loc['accuracy'] = accuracy
+    report_df.loc['macro avg'] = [precision.mean(), recall.mean(), f1.mean(), support.sum()]
+    return accuracy, report_df, conf_mat, churn_rate
+
+# 히스토그램 생성 함수 (구간별 빈도를 서버에서 미리 계산하여 전체 행 대신 구간 수만큼만 전송)
+def make_histogram_figure(values, nbins, title, x_label, y_label, color):
+    if values.size and np.issubdtype(values.dtype, np.integer):
+        # 정수 데이터는 구간 경계를 정수 단위로 맞춰 구간마다 포함되는 값의 개수가 고르게 되도록 함
+        lo, hi = int(values.min()), int(values.max())
+        bin_width = max(1, int(np.ceil((hi - lo + 1) / nbins)))
+        edges = np.arange(lo, hi + bin_width + 1, bin_width) - 0.5
+        # 구간 번호를 정수 나눗셈으로 바로 구해 np.bincount로 집계 (구간 탐색 없이 한 번에 계산)
+        counts = np.bincount((values - lo) // bin_width, minlength=len(edges) - 1)
+    else:
+        counts, edges = np.histogram(values, bins=nbins)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+        marker_color=color, hovertemplate=f"{x_label}=%{{x}}<br>{y_label}=%{{y}}<extra></extra>"
+    ))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title=y_label, bargap=0)
+    return fig
+
+# 빈도 막대 그래프 생성 함수 (집계된 값으로 go.Bar를 직접 생성: plotly express의 데이터프레임 변환 과정 생략)
+def make_count_bar_figure(counts, title, x_label, y_label, colorscale, orientation='v'):
+    categories, values = counts.index.to_numpy(), counts.to_numpy()
+    x, y = (categories, values) if orientation == 'v' else (values, categories)
+    fig = go.Figure(go.Bar(
+        x=x, y=y, orientation=orientation,
+        marker=dict(color=values, coloraxis='coloraxis'),
+        hovertemplate=f"{x_label}=%{{x}}<br>{y_label}=%{{y}}<br>color=%{{marker.color}}<extra></extra>"
+    ))
+    fig.update_layout(
+        title=title, xaxis_title=x_label, yaxis_title=y_label,
+        coloraxis=dict(colorscale=colorscale, colorbar_title_text='color')
+    )
+    return fig
+
+# 비율 묶음 막대 그래프 생성 함수 (행: 범주, 열: 인게이지먼트 레벨인 비율 표를 레벨별 go.Bar로 변환)
+def make_share_bar_figure(shares, title, x_label, colors):
+    categories = shares.index.to_numpy()
+    fig = go.Figure([
+        go.Bar(
+            x=categories, y=shares[level].to_numpy(), name=level, marker_color=color,
+            hovertemplate=f"EngagementLevel={level}<br>{x_label}=%{{x}}<br>비율 (%)=%{{y}}<extra></extra>"
+        )
+        for level, color in zip(shares.columns, colors)
+    ])
+    fig.update_layout(
+        title=title, xaxis_title=x_label, yaxis_title='비율 (%)', legend_title_text='EngagementLevel', barmode='group'
+    )
+    return fig
+
+# 산점도용 표본 추출 함수 (인게이지먼트 레벨별 비율을 유지하는 층화 추출로 전송할 점 개수 제한)
+def sample_for_plot(data, n=5000, stratify='EngagementLevel'):
+    if len(data) <= n:
+        return data
+    return data.groupby(stratify, observed=True).sample(frac=n / len(data), random_state=0)
+
+# 박스 플롯 생성 함수 (인게이지먼트 레벨별 분위수와 이상치만 계산하여 전송)
+def make_box_figure(data, y, title, x_label, y_label, colors):
+    fig = go.Figure()
+    for level, values in data.groupby('EngagementLevel', observed=True)[y]:
+        a = values.to_numpy(dtype=np.float64)
+        # Plotly 기본 quartilemethod='linear'와 같은 보간 (인덱스 n*p - 0.5 = NumPy의 'hazen')
+        q1, median, q3 = np.quantile(a, [0.25, 0.5, 0.75], method='hazen')
+        iqr = q3 - q1
+        is_inlier = (a >= q1 - 1.5 * iqr) & (a <= q3 + 1.5 * iqr)
+        fig.add_trace(go.Box(
+            x=[level], q1=[q1], median=[median], q3=[q3],
+            lowerfence=[a[is_inlier].min()], upperfence=[a[is_inlier].max()],
+            name=level, legendgroup=level, marker_color=colors[level]
+        ))
+        outliers = a[~is_inlier]
+        if outliers.size:
+            fig.add_trace(go.Scatter(
+                x=[level] * outliers.size, y=outliers, mode='markers',
+                name=level, legendgroup=level, showlegend=False, marker_color=colors[level]
+            ))
+    fig.update_layout(
+        title=title, xaxis_title=x_label, yaxis_title=y_label, legend_title_text=x_label,
+        xaxis={'categoryorder': 'array', 'categoryarray': ['Low', 'Medium', 'High']}
+    )
+    return fig
+
+# 탭별 차트 생성 함수 (필터 조합별 캐싱: 필터가 그대로인 재실행에서는 Figure를 다시 만들지 않음)
+@st.cache_data(show_spinner=False, max_entries=FILTER_CACHE_MAX_ENTRIES)
+def build_overview_figures(filter_key):
+    # 인게이지먼트 레벨 분포
+    engagement_counts = get_value_counts(filter_key, 'EngagementLevel', sort=False)
+    fig_pie = go.Figure(go.Pie(
+        labels=engagement_counts.index.to_numpy(),
+        values=engagement_counts.to_numpy(),
+        textposition='inside', textinfo='percent+label',
+        hovertemplate="label=%{label}<br>value=%{value}<extra></extra>"
+    ))
+    fig_pie.update_layout(title="인게이지먼트 레벨 분포", piecolorway=px.colors.qualitative.Set2)
+    
+    # 게임 장르별 유저 수
+    genre_counts = get_value_counts(filter_key, 'GameGenre')
+    fig_bar = make_count_bar_figure(
+        genre_counts, title="게임 장르별 유저 수", x_label='게임 장르', y_label='유저 수',
+        colorscale=px.colors.sequential.Blues
+    )
+    return fig_pie, fig_bar
+
+@st.cache_data(show_spinner=False, max_entries=FILTER_CACHE_MAX_ENTRIES)
+def build_profile_figures(filter_key):
+    data = get_filtered(*filter_key)
+    
+    # 나이 분포
+    fig_age = make_histogram_figure(
+        data['Age'].to_numpy(), nbins=30, title="나이 분포",
+        x_label='나이', y_label='유저 수', color='#636EFA'
+    )
+    
+    # 성별 분포
+    gender_counts = get_value_counts(filter_key, 'Gender')
+    gender_colors = {'Male': '#636EFA', 'Female': '#EF553B'}
+    fig_gender = go.Figure([
+        go.Bar(
+            x=[gender], y=[count], name=gender, marker_color=gender_colors.get(gender),
+            hovertemplate=f"color={gender}<br>성별=%{{x}}<br>유저 수=%{{y}}<extra></extra>"
+        )
+        for gender, count in gender_counts.items()
+    ])
+    # 성별마다 트레이스가 하나씩이므로 'relative'로 두어 막대가 그룹 간격만큼 좁아지지 않도록 함
+    fig_gender.update_layout(
+        title="성별 분포", xaxis_title='성별', yaxis_title='유저 수', legend_title_text='color', barmode='relative'
+    )
+    
+    # 위치별 분포 (Top 10)
+    location_counts = get_value_counts(filter_key, 'Location').head(10)
+    fig_location = make_count_bar_figure(
+        location_counts, title="상위 10개 지역별 유저 수", x_label='유저 수', y_label='지역',
+        colorscale=px.colors.sequential.Viridis, orientation='h'
+    )
+    
+    # 나이 vs 인게이지먼트
+    fig_age_engagement = make_box_figure(
+        data, 'Age', title="인게이지먼트 레벨별 나이 분포",
+        x_label='인게이지먼트 레벨', y_label='나이',
+        colors=dict(zip(['Low', 'Medium', 'High'], px.colors.qualitative.Set1))
+    )
+    return fig_age, fig_gender, fig_location, fig_age_engagement
+
+@st.cache_data(show_spinner=False, max_entries=FILTER_CACHE_MAX_ENTRIES)
+def build_behavior_figures(filter_key):
+    data = get_filtered(*filter_key)
+    
+    # 플레이 시간 vs 인게이지먼트
+    fig_playtime = make_box_figure(
+        data, 'PlayTimeHours', title="인게이지먼트 레벨별 플레이 시간",
+        x_label='인게이지먼트 레벨', y_label='플레이 시간 (시간)',
+        colors=dict(zip(['Low', 'Medium', 'High'], px.colors.qualitative.Pastel))
+    )
+    
+    # 구매율
+    purchase_by_engagement = get_purchase_rate_by_engagement(filter_key)
+    fig_purchases = go.Figure([
+        go.Bar(
+            x=[level], y=[rate], name=level, marker_color=color,
+            texttemplate='%{y:.1f}%', textposition='outside',
+            hovertemplate="인게이지먼트 레벨=%{x}<br>구매율 (%)=%{y}<extra></extra>"
+        )
+        for (level, rate), color in zip(
+            purchase_by_engagement[['EngagementLevel', 'PurchaseRate']].itertuples(index=False),
+            px.colors.qualitative.Set3
+        )
+    ])
+    # 레벨마다 트레이스가 하나씩이므로 'relative'로 두어 막대가 그룹 간격만큼 좁아지지 않도록 함
+    fig_purchases.update_layout(
+        title="인게이지먼트 레벨별 구매 유저 비율", xaxis_title='인게이지먼트 레벨', yaxis_title='구매율 (%)',
+        legend_title_text='인게이지먼트 레벨', barmode='relative',
+        xaxis=dict(categoryorder='array', categoryarray=['Low', 'Medium', 'High'])
+    )
+    
+    # 주간 세션 수 vs 평균 세션 시간
+    scatter_df = sample_for_plot(data)
+    # px.scatter의 데이터프레임 변환 과정 없이 NumPy 배열로 WebGL(Scattergl) 트레이스를 직접 생성
+    fig_scatter = go.Figure()
+    size_ref = 2.0 * scatter_df['PlayTimeHours'].max() / 20 ** 2 # px.scatter의 size_max=20과 같은 크기 기준
+    for level, group in scatter_df.groupby('EngagementLevel', observed=True):
+        fig_scatter.add_trace(go.Scattergl(
+            x=group['SessionsPerWeek'].to_numpy(), y=group['AvgSessionDurationMinutes'].to_numpy(),
+            mode='markers', name=level, legendgroup=level,
+            marker=dict(size=group['PlayTimeHours'].to_numpy(), sizemode='area', sizeref=size_ref, opacity=0.6),
+            customdata=group[['Age', 'Gender', 'GameGenre']].to_numpy(),
+            hovertemplate=(
+                f"EngagementLevel={level}<br>주간 세션 수=%{{x}}<br>평균 세션 시간 (분)=%{{y}}<br>"
+                "PlayTimeHours=%{marker.size}<br>Age=%{customdata[0]}<br>Gender=%{customdata[1]}<br>"
+                "GameGenre=%{customdata[2]}<extra></extra>"
+            )
+        ))
+    fig_scatter.update_layout(
+        title="주간 세션 수 vs 평균 세션 시간", xaxis_title='주간 세션 수', yaxis_title='평균 세션 시간 (분)',
+        legend_title_text='EngagementLevel', legend_itemsizing='constant'
+    )
+    return fig_playtime, fig_purchases, fig_scatter, len(scatter_df)
+
+@st.cache_data(show_spinner=False, max_entries=FILTER_CACHE_MAX_ENTRIES)
+def build_engagement_factor_figures(filter_key):
+    data = get_filtered(*filter_key)
+    
+    # 1. 플레이어 레벨 vs 참여율
+    fig_level = make_box_figure(
+        data, 'PlayerLevel', title="참여 수준별 플레이어 레벨 분포",
+        x_label='EngagementLevel', y_label='플레이어 레벨',
+        colors={'Low': '#EF553B', 'Medium': '#FFC400', 'High': '#636EFA'}
+    )
+    
+    # 2. 업적 달성 vs 참여율
+    # 밀도 곡선은 브라우저에서 계산되므로 값은 그대로 전달하되, 레벨마다 x 배열 없이 트레이스 하나로 만들고
+    # 모든 점 대신 박스 플롯과 같이 이상치만 표시하여 수천 개의 마커를 그리지 않도록 함
+    achievement_colors = {'Low': '#EF553B', 'Medium': '#FFC400', 'High': '#636EFA'}
+    fig_achievements = go.Figure([
+        go.Violin(
+            x0=level, y=values.to_numpy(), name=level, legendgroup=level, scalegroup='EngagementLevel',
+            box_visible=True, points='outliers', marker_color=achievement_colors[level],
+            hovertemplate=f"EngagementLevel={level}<br>잠금 해제된 업적 수=%{{y}}<extra></extra>"
+        )
+        for level, values in data.groupby('EngagementLevel', observed=True)['AchievementsUnlocked']
+    ])
+    fig_achievements.update_layout(
+        title="참여 수준별 업적 달성 분포", xaxis_title='EngagementLevel', yaxis_title='잠금 해제된 업적 수',
+        legend_title_text='EngagementLevel', violinmode='overlay',
+        xaxis={'categoryorder': 'array', 'categoryarray': ['Low', 'Medium', 'High']}
+    )
+    
+    # 3. 게임 난이도 vs 인게이지먼트
+    difficulty_engagement = get_engagement_share(filter_key, 'GameDifficulty')
+    fig_difficulty = make_share_bar_figure(
+        difficulty_engagement, title="게임 난이도별 인게이지먼트 분포 (%)", x_label='게임 난이도',
+        colors=px.colors.qualitative.Bold
+    )
+    
+    # 4. 게임 장르 vs 인게이지먼트
+    genre_engagement = get_engagement_share(filter_key, 'GameGenre')
+    fig_genre_engagement = make_share_bar_figure(
+        genre_engagement, title="게임 장르별 인게이지먼트 분포 (%)", x_label='게임 장르',
+        colors=px.colors.qualitative.G10
+    )
+    return fig_level, fig_achievements, fig_difficulty, fig_genre_engagement
+
 # 데이터 로드
 df = load_data()
 
@@ -84,180 +519,118 @@ if df is not None:
     st.sidebar.markdown("---")
     
     # 필터
+    filter_options = get_filter_options()
+    
     selected_gender = st.sidebar.multiselect(
         "성별 선택",
-        options=df['Gender'].unique(),
-        default=df['Gender'].unique()
+        options=filter_options['genders'],
+        default=filter_options['genders']
     )
     
     selected_genre = st.sidebar.multiselect(
         "게임 장르 선택",
-        options=df['GameGenre'].unique(),
-        default=df['GameGenre'].unique()
+        options=filter_options['genres'],
+        default=filter_options['genres']
     )
     
     age_range = st.sidebar.slider(
         "나이 범위",
-        int(df['Age'].min()),
-        int(df['Age'].max()),
-        (int(df['Age'].min()), int(df['Age'].max()))
+        filter_options['age_min'],
+        filter_options['age_max'],
+        (filter_options['age_min'], filter_options['age_max'])
     )
     
-    # 데이터 필터링
-    filtered_df = df[
-        (df['Gender'].isin(selected_gender)) &
-        (df['GameGenre'].isin(selected_genre)) &
-        (df['Age'] >= age_range[0]) &
-        (df['Age'] <= age_range[1])
-    ].copy()
+    # 데이터 필터링 (캐시 키로 사용할 수 있도록 정렬된 튜플로 전달)
+    filter_key = (
+        tuple(sorted(selected_gender)),
+        tuple(sorted(selected_genre)),
+        tuple(age_range)
+    )
     
     # 탭 구성
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+    # st.tabs는 보이지 않는 탭까지 매 재실행마다 모두 계산하므로,
+    # 가로형 라디오 버튼으로 선택된 화면 하나만 계산·렌더링
+    views = [
         "📈 개요", 
         "👥 유저 프로필", 
         "🎮 게임 행동", 
         "🚀 참여율 증진 요인 분석", # Tab 4 제목 변경 유지
         "🚫 사용자 이탈 예측 모델"
-    ])
+    ]
+    active_view = st.radio("화면 선택", views, horizontal=True, label_visibility="collapsed", key="active_view")
     
     # Tab 1: 개요
-    with tab1:
+    if active_view == views[0]:
         st.header("📊 데이터셋 개요 및 핵심 지표")
         
         # 주요 지표
         col1, col2, col3, col4, col5 = st.columns(5)
+        kpis = get_overview_kpis(filter_key)
         
         with col1:
-            st.metric("전체 유저 수", f"{len(filtered_df):,}")
+            st.metric("전체 유저 수", f"{kpis['n_users']:,}")
         with col2:
-            avg_playtime = filtered_df['PlayTimeHours'].mean()
-            st.metric("평균 플레이 시간", f"{avg_playtime:.1f}h")
+            st.metric("평균 플레이 시간", f"{kpis['avg_playtime']:.1f}h")
         with col3:
-            high_engagement = (filtered_df['EngagementLevel'] == 'High').sum()
-            st.metric("고관여 유저", f"{high_engagement:,}")
+            st.metric("고관여 유저", f"{kpis['high_engagement']:,}")
         with col4:
-            purchase_rate = (filtered_df['InGamePurchases'] == 1).mean() * 100
-            st.metric("구매 유저 비율", f"{purchase_rate:.1f}%")
+            st.metric("구매 유저 비율", f"{kpis['purchase_rate']:.1f}%")
         with col5:
-            avg_ltv = filtered_df['LTV_Proxy'].mean()
-            st.metric("평균 유저 가치", f"₩{int(avg_ltv):,}")
+            st.metric("평균 유저 가치", f"₩{int(kpis['avg_ltv']):,}")
         
         st.markdown("---")
         
         # 인게이지먼트 레벨 분포
         col1, col2 = st.columns(2)
+        fig_pie, fig_bar = build_overview_figures(filter_key)
         
         with col1:
-            engagement_counts = filtered_df['EngagementLevel'].value_counts().sort_index()
-            fig_pie = px.pie(
-                values=engagement_counts.values,
-                names=engagement_counts.index,
-                title="인게이지먼트 레벨 분포",
-                color_discrete_sequence=px.colors.qualitative.Set2
-            )
-            fig_pie.update_traces(textposition='inside', textinfo='percent+label')
             st.plotly_chart(fig_pie, use_container_width=True)
         
         with col2:
-            genre_counts = filtered_df['GameGenre'].value_counts()
-            fig_bar = px.bar(
-                x=genre_counts.index,
-                y=genre_counts.values,
-                title="게임 장르별 유저 수",
-                labels={'x': '게임 장르', 'y': '유저 수'},
-                color=genre_counts.values,
-                color_continuous_scale='Blues'
-            )
             st.plotly_chart(fig_bar, use_container_width=True)
     
     # Tab 2: 유저 프로필 분석 (변화 없음)
-    with tab2:
+    if active_view == views[1]:
         st.header("👥 유저 프로필 분석")
         
         col1, col2 = st.columns(2)
+        fig_age, fig_gender, fig_location, fig_age_engagement = build_profile_figures(filter_key)
         
         with col1:
             # 나이 분포
-            fig_age = px.histogram(
-                filtered_df, x='Age', nbins=30, title="나이 분포",
-                labels={'Age': '나이', 'count': '유저 수'}, color_discrete_sequence=['#636EFA']
-            )
             st.plotly_chart(fig_age, use_container_width=True)
             
             # 성별 분포
-            gender_counts = filtered_df['Gender'].value_counts()
-            fig_gender = px.bar(
-                x=gender_counts.index, y=gender_counts.values, title="성별 분포",
-                labels={'x': '성별', 'y': '유저 수'}, 
-                color=gender_counts.index, color_discrete_map={'Male': '#636EFA', 'Female': '#EF553B'}
-            )
             st.plotly_chart(fig_gender, use_container_width=True)
         
         with col2:
             # 위치별 분포 (Top 10)
-            location_counts = filtered_df['Location'].value_counts().head(10)
-            fig_location = px.bar(
-                x=location_counts.values, y=location_counts.index, orientation='h', 
-                title="상위 10개 지역별 유저 수", labels={'x': '유저 수', 'y': '지역'}, 
-                color=location_counts.values, color_continuous_scale='Viridis'
-            )
             st.plotly_chart(fig_location, use_container_width=True)
             
             # 나이 vs 인게이지먼트
-            fig_age_engagement = px.box(
-                filtered_df, x='EngagementLevel', y='Age', title="인게이지먼트 레벨별 나이 분포",
-                labels={'EngagementLevel': '인게이지먼트 레벨', 'Age': '나이'}, color='EngagementLevel',
-                category_orders={"EngagementLevel": ['Low', 'Medium', 'High']},
-                color_discrete_sequence=px.colors.qualitative.Set1
-            )
             st.plotly_chart(fig_age_engagement, use_container_width=True)
 
     # Tab 3: 게임 행동 패턴 분석 (난이도 차트 제거)
-    with tab3:
+    if active_view == views[2]:
         st.header("🎮 게임 행동 패턴 분석")
         
         # 플레이 시간 vs 인게이지먼트
         col1, col2 = st.columns(2)
+        fig_playtime, fig_purchases, fig_scatter, n_scatter_points = build_behavior_figures(filter_key)
         
         with col1:
-            fig_playtime = px.box(
-                filtered_df, x='EngagementLevel', y='PlayTimeHours', title="인게이지먼트 레벨별 플레이 시간",
-                labels={'EngagementLevel': '인게이지먼트 레벨', 'PlayTimeHours': '플레이 시간 (시간)'},
-                color='EngagementLevel',
-                category_orders={"EngagementLevel": ['Low', 'Medium', 'High']},
-                color_discrete_sequence=px.colors.qualitative.Pastel
-            )
             st.plotly_chart(fig_playtime, use_container_width=True)
         
         with col2:
             # 구매율
-            purchase_by_engagement = filtered_df.groupby('EngagementLevel')['InGamePurchases'].apply(
-                lambda x: (x == 1).mean() * 100
-            ).reset_index()
-            purchase_by_engagement.columns = ['EngagementLevel', 'PurchaseRate']
-            
-            fig_purchases = px.bar(
-                purchase_by_engagement, 
-                x='EngagementLevel', 
-                y='PurchaseRate', 
-                title="인게이지먼트 레벨별 구매 유저 비율",
-                labels={'EngagementLevel': '인게이지먼트 레벨', 'PurchaseRate': '구매율 (%)'},
-                color='EngagementLevel',
-                category_orders={"EngagementLevel": ['Low', 'Medium', 'High']},
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            fig_purchases.update_traces(texttemplate='%{y:.1f}%', textposition='outside')
             st.plotly_chart(fig_purchases, use_container_width=True)
         
         # 주간 세션 수 vs 평균 세션 시간 (Tab 3에 유지)
         st.subheader("주간 세션 수 vs 평균 세션 시간")
-        fig_scatter = px.scatter(
-            filtered_df, x='SessionsPerWeek', y='AvgSessionDurationMinutes', color='EngagementLevel',
-            title="주간 세션 수 vs 평균 세션 시간",
-            labels={'SessionsPerWeek': '주간 세션 수', 'AvgSessionDurationMinutes': '평균 세션 시간 (분)'},
-            opacity=0.6, size='PlayTimeHours', hover_data=['Age', 'Gender', 'GameGenre'],
-            category_orders={"EngagementLevel": ['Low', 'Medium', 'High']},
-        )
+        n_users = get_overview_kpis(filter_key)['n_users']
+        if n_scatter_points < n_users:
+            st.caption(f"표시된 점: {n_scatter_points:,}명 / 전체 {n_users:,}명 (인게이지먼트 레벨별 층화 표본)")
         st.plotly_chart(fig_scatter, use_container_width=True)
         
         st.markdown(
@@ -265,23 +638,14 @@ if df is not None:
         )
 
     # Tab 4: 참여율 증진 요인 분석 (난이도, 장르 추가)
-    with tab4:
+    if active_view == views[3]:
         st.header("🚀 참여율 증진 요인 분석: 무엇이 유저 참여를 높이는가?")
         st.markdown("사용자의 참여 수준('Low' -> 'High')에 영향을 미치는 주요 요인들을 분석하여, 리텐션 및 몰입 증진 전략의 기반을 마련합니다.")
         
+        fig_level, fig_achievements, fig_difficulty, fig_genre_engagement = build_engagement_factor_figures(filter_key)
+        
         # 1. 플레이어 레벨 vs 참여율 (유지)
         st.subheader("1. 플레이어 레벨 (PlayerLevel)별 참여 수준 분포")
-        
-        fig_level = px.box(
-            filtered_df, 
-            x='EngagementLevel', 
-            y='PlayerLevel', 
-            color='EngagementLevel',
-            category_orders={"EngagementLevel": ['Low', 'Medium', 'High']},
-            title="참여 수준별 플레이어 레벨 분포",
-            color_discrete_map={'Low': '#EF553B', 'Medium': '#FFC400', 'High': '#636EFA'},
-            labels={'PlayerLevel': '플레이어 레벨'}
-        )
         st.plotly_chart(fig_level, use_container_width=True)
         st.markdown(
             "**인사이트:** 'High' 유저의 레벨 중앙값이 'Low' 유저보다 현저히 높다면, **레벨업 인센티브**와 **초기 성장 구간** 관리를 통해 신규 유저의 이탈을 방지하고 참여를 유도해야 합니다."
@@ -289,18 +653,6 @@ if df is not None:
 
         # 2. 업적 달성 vs 참여율 (유지)
         st.subheader("2. 잠금 해제된 업적 수 (AchievementsUnlocked) vs 참여율")
-        fig_achievements = px.violin(
-            filtered_df, 
-            x='EngagementLevel', 
-            y='AchievementsUnlocked', 
-            color='EngagementLevel',
-            category_orders={"EngagementLevel": ['Low', 'Medium', 'High']},
-            title="참여 수준별 업적 달성 분포",
-            color_discrete_map={'Low': '#EF553B', 'Medium': '#FFC400', 'High': '#636EFA'},
-            box=True,
-            points="all",
-            labels={'AchievementsUnlocked': '잠금 해제된 업적 수'}
-        )
         st.plotly_chart(fig_achievements, use_container_width=True)
         st.markdown(
             "**인사이트:** 업적 달성 수가 참여 수준과 강한 상관관계를 보인다면, **참여 유도형 업적 시스템**을 신규/복귀 유저에게 집중적으로 노출하여 지속적인 목표를 제공해야 합니다."
@@ -308,15 +660,6 @@ if df is not None:
 
         # 3. 게임 난이도 vs 인게이지먼트 (Tab 3에서 이동)
         st.subheader("3. 게임 난이도 (GameDifficulty)별 참여 수준 분포 (%)")
-        difficulty_engagement = pd.crosstab(
-            filtered_df['GameDifficulty'], filtered_df['EngagementLevel'], normalize='index'
-        ) * 100
-        
-        fig_difficulty = px.bar(
-            difficulty_engagement, barmode='group', title="게임 난이도별 인게이지먼트 분포 (%)",
-            labels={'value': '비율 (%)', 'GameDifficulty': '게임 난이도'},
-            color_discrete_sequence=px.colors.qualitative.Bold
-        )
         st.plotly_chart(fig_difficulty, use_container_width=True)
         st.markdown(
             "**인사이트:** 특정 난이도('Hard' 또는 'Easy')에서 'High' 인게이지먼트 유저의 비율이 높다면, **해당 난이도 선호 그룹**에 맞는 맞춤형 콘텐츠 업데이트가 효과적일 수 있습니다. 'Medium'이 가장 분산되어 있다면, 난이도 세분화가 필요합니다."
@@ -324,15 +667,6 @@ if df is not None:
 
         # 4. 게임 장르 vs 인게이지먼트 (추가 요청)
         st.subheader("4. 게임 장르 (GameGenre)별 참여 수준 분포 (%)")
-        genre_engagement = pd.crosstab(
-            filtered_df['GameGenre'], filtered_df['EngagementLevel'], normalize='index'
-        ) * 100
-
-        fig_genre_engagement = px.bar(
-            genre_engagement, barmode='group', title="게임 장르별 인게이지먼트 분포 (%)",
-            labels={'value': '비율 (%)', 'GameGenre': '게임 장르'},
-            color_discrete_sequence=px.colors.qualitative.G10
-        )
         st.plotly_chart(fig_genre_engagement, use_container_width=True)
         st.markdown(
             "**인사이트:** 'High' 인게이지먼트 유저가 특정 장르(예: 'RPG')에 집중되어 있다면, **해당 장르의 핵심 매커니즘**을 다른 장르에 부분적으로 차용하거나, 해당 장르 유저를 위한 **크로스 프로모션**을 기획하는 것이 참여율 증진에 도움이 될 수 있습니다."
@@ -340,7 +674,7 @@ if df is not None:
 
 
     # Tab 5: 사용자 이탈 예측 모델 (로지스틱 회귀 보고서 추가, 특성 중요도 제거)
-    with tab5:
+    if active_view == views[4]:
         st.header("🚫 사용자 이탈 예측 모델 (User Churn Prediction)")
         st.markdown("저관여 유저(Engagement Level = 'Low')를 **이탈 위험 사용자(Churn=1)**로 정의하고, 로지스틱 회귀 모델을 통해 이탈 가능성을 예측합니다. 이를 통해 선제적인 리텐션 대상자를 파악할 수 있습니다.")
         st.image("https://images.unsplash.com/photo-1542838749-43486162c938?crop=entropy&cs=tinysrgb&fit=max&fm=jpg&ixid=M3w0NTIyMjh8MHwxfHNlYXJjaHwxfHxDaHVybiUyMFByZWRpY3Rpb24lMjBtb2RlbCUyMHdvcmtmbG93fGVufDB8fHx8MTcwOTk2MTIwMHww&ixlib=rb-4.0.3&q=80&w=1080", 
@@ -348,64 +682,30 @@ if df is not None:
                  use_column_width=True)
 
         # 1. 데이터 준비: 'Low'를 이탈(1), 나머지를 활동(0)으로 정의
-        if filtered_df.empty:
+        # Churn 레이블은 load_data에서 미리 계산됨 (행/결측치 수만 캐시된 요약에서 가져옴)
+        churn_data = get_churn_data_summary(filter_key)
+        if churn_data['n_rows'] == 0:
             st.warning("필터링된 데이터가 없어 모델 학습을 진행할 수 없습니다.")
             st.stop()
-            
-        # .loc를 사용하여 SettingWithCopyWarning 방지
-        filtered_df.loc[:, 'Churn'] = filtered_df['EngagementLevel'].apply(lambda x: 1 if x == 'Low' else 0)
-        
-        features = [
-            'Age', 'Gender', 'Location', 'GameGenre', 'PlayTimeHours', 
-            'InGamePurchases', 'GameDifficulty', 'SessionsPerWeek', 
-            'AvgSessionDurationMinutes', 'PlayerLevel', 'AchievementsUnlocked'
-        ]
-        target = 'Churn'
         
-        df_model = filtered_df[features + [target]].copy()
+        # 결측치 처리 (결측치가 있는 행은 train_churn_model에서 제거)
+        if churn_data['nan_count'] > 0:
+            st.info(f"데이터에서 총 {churn_data['nan_count']}개의 결측치(NaN)가 발견되어 모델 학습 전에 해당 행을 제거합니다.")
         
-        # 결측치 처리
-        nan_count_before = df_model.isnull().sum().sum()
-        if nan_count_before > 0:
-            st.info(f"데이터에서 총 {nan_count_before}개의 결측치(NaN)가 발견되어 모델 학습 전에 해당 행을 제거합니다.")
-            df_model.dropna(inplace=True)
-        
-        if df_model.empty:
+        if churn_data['n_complete'] == 0:
             st.warning("데이터 클리닝 후 남은 데이터가 없어 모델 학습을 진행할 수 없습니다.")
             st.stop()
-            
-        X = df_model[features]
-        y = df_model[target]
         
-        # 2. 전처리 파이프라인 구축
-        numeric_features = ['Age', 'PlayTimeHours', 'SessionsPerWeek', 'AvgSessionDurationMinutes', 'PlayerLevel', 'AchievementsUnlocked']
-        categorical_features = ['Gender', 'Location', 'GameGenre', 'GameDifficulty', 'InGamePurchases'] # InGamePurchases는 0/1이지만 OHE로 처리하여 Exp(B) 해석을 단순화
-        
-        preprocessor = ColumnTransformer(
-            transformers=[
-                ('num', StandardScaler(), numeric_features),
-                ('cat', OneHotEncoder(handle_unknown='ignore', sparse_output=False), categorical_features)
-            ],
-            remainder='drop' # 나머지 컬럼은 버림
-        )
-
-        # 3. 모델 정의 및 학습
-        model = Pipeline(steps=[('preprocessor', preprocessor),
-                                 ('classifier', LogisticRegression(solver='liblinear', random_state=42))])
-        
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+        if churn_data['n_complete'] > CHURN_MAX_TRAIN_ROWS:
+            st.info(f"모델은 {CHURN_MAX_TRAIN_ROWS:,}행 샘플로 학습됨 (전체 {churn_data['n_complete']:,}행 중 층화 추출)")
         
         st.subheader("모델 학습 및 성능 평가 (Logistic Regression)")
         
         try:
             with st.spinner('모델 학습 및 평가 중...'):
-                model.fit(X_train, y_train)
-                y_pred = model.predict(X_test)
-                
-                # 성능 지표
-                accuracy = accuracy_score(y_test, y_pred)
-                report = classification_report(y_test, y_pred, target_names=['Active (0)', 'Churn (1)'], output_dict=True)
-                conf_mat = confusion_matrix(y_test, y_pred)
+                # 필터가 바뀌지 않았다면 캐시된 모델과 성능 지표를 그대로 사용
+                model, _, _ = train_churn_model(filter_key)
+                accuracy, report_df, conf_mat, churn_rate = evaluate_churn_model(filter_key)
 
             st.success("✅ 모델 학습 완료!")
 
@@ -416,7 +716,7 @@ if df is not None:
                 st.metric(label="모델 정확도 (Accuracy)", value=f"{accuracy:.4f}")
                 
                 st.subheader("이탈 비율 (Test Set)")
-                st.info(f"실제 이탈 비율: {y_test.sum() / len(y_test) * 100:.2f}%")
+                st.info(f"실제 이탈 비율: {churn_rate:.2f}%")
 
                 st.subheader("혼동 행렬")
                 conf_df = pd.DataFrame(conf_mat, 
@@ -426,8 +726,7 @@ if df is not None:
 
             with col_rep:
                 st.subheader("분류 보고서")
-                report_df = pd.DataFrame(report).transpose()
-                st.dataframe(report_df.iloc[:-1, :].style.format({'precision': "{:.2f}", 'recall': "{:.2f}", 'f1-score': "{:.2f}"}))
+                st.dataframe(report_df.style.format({'precision': "{:.2f}", 'recall': "{:.2f}", 'f1-score': "{:.2f}"}))
                 st.markdown(f"""
                 - **정밀도 (Churn=1):** 모델이 이탈이라고 예측한 사용자 중 실제로 이탈한 비율
                 - **재현율 (Churn=1):** 실제 이탈 사용자 중 모델이 정확히 이탈이라고 예측한 비율 (이탈 사용자 선별 능력)
@@ -442,46 +741,58 @@ if df is not None:
             
             # 전체 특성 이름 가져오기
             try:
-                feature_names = numeric_features + list(model.named_steps['preprocessor'].named_transformers_['cat'].get_feature_names_out(categorical_features))
+                feature_names = CHURN_NUMERIC_FEATURES + list(model.named_steps['preprocessor'].named_transformers_['cat'].get_feature_names_out(CHURN_CATEGORICAL_FEATURES))
             except AttributeError:
                  feature_names = [] # 오류 방지용 임시 처리
             
             if len(feature_names) == len(classifier.coef_[0]):
                 coefficients = pd.Series(classifier.coef_[0], index=feature_names)
                 
-                # Exp(B) (오즈비) 계산
+                # 유의미한 변수 (회귀 계수의 절대값이 큰 상위 20개만 표시)
+                # Sig. 값을 알 수 없으므로, 절대값으로 판단하고 중요도 순으로 정렬합니다.
+                # (전체 정렬 대신 np.argpartition으로 상위 20개만 고른 뒤 그 안에서만 정렬)
+                coef = classifier.coef_[0]
+                abs_coef = np.abs(coef)
+                top_n = min(20, coef.size)
+                top = np.argpartition(-abs_coef, top_n - 1)[:top_n]
+                top = top[np.argsort(-abs_coef[top], kind='stable')]
+                
+                # Exp(B) (오즈비) 계산 (표에 표시할 상위 변수만)
                 df_results = pd.DataFrame({
-                    '변수': feature_names,
-                    'B (회귀 계수)': classifier.coef_[0],
-                    'Exp(B) (오즈비)': np.exp(classifier.coef_[0])
-                })
+                    '변수': np.asarray(feature_names)[top],
+                    'B (회귀 계수)': coef[top],
+                    'Exp(B) (오즈비)': np.exp(coef[top])
+                }, index=top)
 
                 # 해석 필드 생성
-                df_results['요인 유형'] = df_results['Exp(B) (오즈비)'].apply(lambda x: '잔존 요인 (보호)' if x < 1.0 else '이탈 위험 요인')
-                df_results['오즈 변화율 (%)'] = df_results['Exp(B) (오즈비)'].apply(lambda x: f"{abs(round((x - 1) * 100, 1)):.1f}% {'감소' if x < 1.0 else '증가'}")
-                
-                # 유의미한 변수 (회귀 계수의 절대값이 큰 상위 20개만 표시)
-                # Sig. 값을 알 수 없으므로, 절대값으로 판단하고 중요도 순으로 정렬합니다.
-                df_results['abs_B'] = df_results['B (회귀 계수)'].abs()
-                df_results = df_results.sort_values(by='abs_B', ascending=False).head(20).drop(columns=['abs_B'])
+                df_results['요인 유형'] = np.where(df_results['Exp(B) (오즈비)'] < 1.0, '잔존 요인 (보호)', '이탈 위험 요인')
+                odds_ratio = df_results['Exp(B) (오즈비)'].to_numpy()
+                df_results['오즈 변화율 (%)'] = np.char.add(
+                    np.char.mod('%.1f', np.abs((odds_ratio - 1) * 100)),
+                    np.where(odds_ratio < 1.0, '% 감소', '% 증가')
+                )
 
                 # 시각화를 위한 필터링 및 컬럼 순서 조정
-                df_interpretation = df_results[['변수', 'B (회귀 계수)', 'Exp(B) (오즈비)', '요인 유형', '오즈 변화율 (%)']].copy()
+                df_interpretation = df_results[['변수', 'B (회귀 계수)', 'Exp(B) (오즈비)', '요인 유형', '오즈 변화율 (%)']]
                 
                 # 스타일링 함수 정의 (잔존/위험 요인에 따라 색상 부여)
-                def highlight_factor(s):
-                    is_risk = s['요인 유형'] == '이탈 위험 요인'
-                    is_retention = s['요인 유형'] == '잔존 요인 (보호)'
-                    color = ''
-                    if is_risk:
-                        color = 'background-color: #ffe8e8; font-weight: bold; color: #cc0000' # 연한 빨강
-                    elif is_retention:
-                        color = 'background-color: #e8ffe8; font-weight: bold; color: #008000' # 연한 초록
-                    
-                    return [color if col in ['변수', '요인 유형', '오즈 변화율 (%)'] else '' for col in df_interpretation.columns]
+                # 행마다 함수를 호출하지 않고 표 전체의 CSS 행렬을 한 번에 생성 (Styler.apply의 axis=None)
+                def highlight_factor(data):
+                    row_color = np.select(
+                        [data['요인 유형'] == '이탈 위험 요인', data['요인 유형'] == '잔존 요인 (보호)'],
+                        [
+                            'background-color: #ffe8e8; font-weight: bold; color: #cc0000', # 연한 빨강
+                            'background-color: #e8ffe8; font-weight: bold; color: #008000' # 연한 초록
+                        ],
+                        default=''
+                    )
+                    is_highlighted = data.columns.isin(['변수', '요인 유형', '오즈 변화율 (%)'])
+                    return pd.DataFrame(
+                        np.where(is_highlighted, row_color[:, None], ''), index=data.index, columns=data.columns
+                    )
 
                 st.dataframe(
-                    df_interpretation.style.apply(highlight_factor, axis=1).format({'B (회귀 계수)': "{:.4f}", 'Exp(B) (오즈비)': "{:.3f}"}),
+                    df_interpretation.style.apply(highlight_factor, axis=None).format({'B (회귀 계수)': "{:.4f}", 'Exp(B) (오즈비)': "{:.3f}"}),
                     height=400,
                     use_container_width=True
                 )
@@ -505,7 +816,7 @@ if df is not None:
     st.sidebar.markdown("---")
     st.sidebar.subheader("📥 데이터 다운로드")
     
-    csv = filtered_df.to_csv(index=False).encode('utf-8-sig')
+    csv = get_csv_bytes(filter_key)
     st.sidebar.download_button(
         label="필터링된 데이터 다운로드 (CSV)",
         data=csv,